@@ -0,0 +1,10 @@
+# Production server settings: gunicorn -c gunicorn.conf.py prototype_app:app
+import multiprocessing
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+threads = 2
+
+# import the app (CSV tables, document index) once in the master so the forked workers share it copy-on-write
+preload_app = True
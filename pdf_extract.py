@@ -0,0 +1,110 @@
+# Text extraction for the document index. Kept in its own module so pool workers can unpickle these
+# functions while prototype_app is still being imported (e.g. by gunicorn --preload).
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import atexit
+import functools
+import multiprocessing
+import os
+
+try:
+    import pymupdf as fitz  # PyMuPDF: C backend, much faster than PyPDF2 when installed
+except Exception:
+    try:
+        import fitz  # older PyMuPDF releases only ship the "fitz" name
+    except Exception:
+        fitz = None
+
+try:
+    from PyPDF2 import PdfReader  # pure-Python fallback
+except Exception:
+    PdfReader = None
+
+HAVE_PDF = fitz is not None or PdfReader is not None
+
+PDF_POOL_WORKERS = min(os.cpu_count() or 1, 4)
+PDF_PARALLEL_MIN_PAGES = 8  # smaller PDFs are cheaper to extract in-process than to fan out
+
+_PDF_POOL = None
+_OWNER_PID = os.getpid()  # process that loaded the app; forked server workers extract in-process
+
+def get_pdf_pool():
+    """Return the shared process pool for PDF extraction, or None outside the process that loaded the app."""
+    global _PDF_POOL
+    if PDF_POOL_WORKERS < 2 or multiprocessing.parent_process() is not None or os.getpid() != _OWNER_PID:
+        # pool workers and forked server workers (one per CPU already) would oversubscribe the CPUs
+        return None
+    if _PDF_POOL is None:
+        _PDF_POOL = ProcessPoolExecutor(max_workers=PDF_POOL_WORKERS)
+        atexit.register(shutdown_pdf_pool)
+    return _PDF_POOL
+
+def shutdown_pdf_pool():
+    """Stop the pool's processes (e.g. before a server forks its workers); it is recreated on demand."""
+    global _PDF_POOL
+    if _PDF_POOL is not None:
+        _PDF_POOL.shutdown()
+        _PDF_POOL = None
+
+def _pdf_page_count(path_str: str) -> int:
+    if fitz is not None:
+        with fitz.open(path_str) as doc:
+            return len(doc)
+    return len(PdfReader(path_str).pages)
+
+def _extract_pdf_page(path_str: str, page_idx: int) -> str:
+    """Extract a single PDF page (runs in a pool worker)."""
+    if fitz is not None:
+        with fitz.open(path_str) as doc:
+            return doc[page_idx].get_text()
+    return PdfReader(path_str).pages[page_idx].extract_text() or ""
+
+def iter_page_texts(path_str: str):
+    """Yield the text of each PDF page in order, parsing a page only when it is requested."""
+    if fitz is not None:
+        with fitz.open(path_str) as doc:
+            for page in doc:
+                yield page.get_text()
+    else:
+        for p in PdfReader(path_str).pages:
+            yield p.extract_text() or ""
+
+def _extract_pdf(path_str: str) -> str:
+    """Extract all pages of a PDF in-process."""
+    return "".join(iter_page_texts(path_str))
+
+def extract_text_from_file(path: Path) -> str:
+    """Return text from .txt or .pdf; empty string on any failure. Cached per (path, mtime)."""
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except OSError:
+        return ""
+    return _extract_cached(str(path), mtime_ns)
+
+# small on purpose: the document index already keeps every document's text, and index builds only extract
+# files whose mtime changed, so this mainly saves re-extraction when INDEX_PKL cannot be written
+@functools.lru_cache(maxsize=64)
+def _extract_cached(path_str: str, mtime_ns: int) -> str:
+    # mtime_ns is only part of the cache key, so edited files are re-extracted
+    path = Path(path_str)
+    try:
+        if path.suffix.lower() == ".txt":
+            return path.read_text(encoding="utf-8", errors="ignore")
+        if path.suffix.lower() == ".pdf" and HAVE_PDF:
+            n_pages = _pdf_page_count(path_str)
+            pool = get_pdf_pool() if n_pages >= PDF_PARALLEL_MIN_PAGES else None
+            if pool is not None:
+                return "".join(pool.map(_extract_pdf_page, [path_str] * n_pages, range(n_pages)))
+            return _extract_pdf(path_str)
+    except Exception:
+        # If PDF extraction fails (e.g., scanned images), return empty string
+        return ""
+    return ""
+
+def extract_many(paths):
+    """Extract text for several files, spreading them over the process pool when there are multiple PDFs."""
+    n_pdfs = sum(1 for p in paths if p.suffix.lower() == ".pdf")
+    pool = get_pdf_pool() if n_pdfs > 1 and HAVE_PDF else None
+    if pool is None:
+        return [extract_text_from_file(p) for p in paths]
+    return list(pool.map(extract_text_from_file, paths))
@@ -1,16 +1,38 @@
-from flask import Flask, request, render_template_string, send_from_directory
+from flask import Flask, Response, request, send_from_directory
+from flask_caching import Cache
+from urllib.parse import quote
+from werkzeug.security import safe_join
+from pdf_extract import extract_many, shutdown_pdf_pool
+import numpy as np
 import pandas as pd
 from pathlib import Path
+import collections
 import json
+import mimetypes
+import os
+import pickle
+import re
 import sys
+import threading
+import time
+import unicodedata
 
 try:
-    from PyPDF2 import PdfReader
+    import pyarrow as pa
+    import pyarrow.feather as pa_feather  # optional: columnar .feather copies of the CSVs
 except Exception:
-    PdfReader = None
+    pa = None
 
 app = Flask(__name__)
 
+# rendered search pages are cached per query string; set CACHE_TYPE=RedisCache (plus CACHE_REDIS_URL)
+# to share the cache between worker processes
+cache = Cache(app, config={
+    "CACHE_TYPE": os.environ.get("CACHE_TYPE", "SimpleCache"),
+    "CACHE_REDIS_URL": os.environ.get("CACHE_REDIS_URL", ""),
+    "CACHE_DEFAULT_TIMEOUT": 60,
+})
+
 BASE = Path("/home/DavidOluwalana/prototype_ir")
 STUDENTS_CSV = BASE / "students.csv"
 GRADES_CSV = BASE / "grades.csv"
@@ -18,15 +40,48 @@ COURSES_JSON = BASE / "courses.json"
 UNSTRUCTURED_DIR = BASE / "unstructured"
 STATIC_DIR = BASE / "static"
 
+# file downloads can be handed to the front-end web server instead of streaming through Python:
+#   SENDFILE=apache -> X-Sendfile header (mod_xsendfile)
+#   SENDFILE=nginx  -> X-Accel-Redirect to an internal location aliased to UNSTRUCTURED_DIR
+SENDFILE = os.environ.get("SENDFILE", "").lower()
+ACCEL_REDIRECT_PREFIX = os.environ.get("ACCEL_REDIRECT_PREFIX", "/internal_files/")
+app.config["USE_X_SENDFILE"] = SENDFILE == "apache"
+
+INDEX_PKL = BASE / "index.pkl"  # persisted document index, reused across restarts
+
 def load_csv_safe(path: Path):
+    """Load a CSV as strings, preferring a .feather copy made from the same CSV (needs pyarrow)."""
     if not path.exists():
         print(f"[WARN] CSV not found: {path}", file=sys.stderr)
         return pd.DataFrame()
+    feather = path.with_suffix(".feather")
+    st = path.stat()
+    # exact mtime + size of the CSV the copy was made from; an older-mtime replacement (cp -p,
+    # rsync -t, git checkout) must not keep serving the old copy
+    source = f"{st.st_mtime_ns}:{st.st_size}".encode()
+    if pa is not None and feather.exists():
+        try:
+            table = pa_feather.read_table(feather)
+            if (table.schema.metadata or {}).get(b"source_csv") == source:
+                return table.to_pandas()
+        except Exception as e:
+            print(f"[WARN] Ignoring unreadable {feather}: {e}", file=sys.stderr)
     try:
-        return pd.read_csv(path, dtype=str).fillna("")  # keep strings and avoid NaN errors
+        df = pd.read_csv(path, dtype=str).fillna("")  # keep strings and avoid NaN errors
     except Exception as e:
         print(f"[ERROR] Failed to read CSV {path}: {e}", file=sys.stderr)
         return pd.DataFrame()
+    if pa is not None:
+        # columnar copy for faster loads on the next start, written like save_pickle_safe
+        tmp = feather.with_name(f"{feather.name}.{os.getpid()}.tmp")
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}), b"source_csv": source})
+            pa_feather.write_feather(table, str(tmp))
+            os.replace(tmp, feather)
+        except Exception as e:
+            print(f"[WARN] Could not write {feather}: {e}", file=sys.stderr)
+    return df
 
 def load_json_safe(path: Path):
     if not path.exists():
@@ -39,23 +94,6 @@ def load_json_safe(path: Path):
         print(f"[ERROR] Failed to load JSON {path}: {e}", file=sys.stderr)
         return []
 
-def extract_text_from_file(path: Path) -> str:
-    """Return text from .txt or .pdf; empty string on any failure."""
-    try:
-        if path.suffix.lower() == ".txt":
-            return path.read_text(encoding="utf-8", errors="ignore")
-        if path.suffix.lower() == ".pdf" and PdfReader is not None:
-            reader = PdfReader(str(path))
-            text = ""
-            for p in reader.pages:
-                text += (p.extract_text() or "")
-            return text
-    except Exception:
-        # If PDF extraction fails (e.g., scanned images), return empty string
-        return ""
-    return ""
-
-
 students_df = load_csv_safe(STUDENTS_CSV)  # expects columns like student_id, name, programme, year, gpa, email, Attendance_RATE (or Attendance)
 grades_df = load_csv_safe(GRADES_CSV)      # supports wide format or long format
 courses_data = load_json_safe(COURSES_JSON)
@@ -80,126 +118,264 @@ if "course_id" in grades_long_df.columns and "course_id" in courses_df.columns:
     except Exception as e:
         print(f"[WARN] Could not merge courses metadata: {e}", file=sys.stderr)
 
+def add_lower_column(df: pd.DataFrame, src: str, dst: str):
+    """Store a stripped, lowercased copy of df[src] in df[dst] ('' when src is missing)."""
+    df[dst] = df[src].astype(str).str.strip().str.lower() if src in df.columns else ""
+
+# public student columns (shown in results) and lowercase helper columns used for vectorized search
+STUDENT_COLS = list(students_df.columns)
+add_lower_column(students_df, "student_id", "_sid_l")
+add_lower_column(students_df, "name", "_name_l")
+add_lower_column(students_df, "programme", "_programme_l")
+add_lower_column(students_df, "email", "_email_l")
+
+def build_student_lookup(df: pd.DataFrame):
+    """Map lowercase student_id -> row label for ids that occur exactly once."""
+    if df.empty:
+        return {}
+    counts = df["_sid_l"].value_counts()
+    return {sid: label for label, sid in df["_sid_l"].items() if sid and counts[sid] == 1}
+
+STUDENT_BY_SID = build_student_lookup(students_df)
+# every name/programme/email in one string: an id found in it must still go through the full mask
+STUDENT_HAYSTACK = "\n".join(pd.concat([students_df["_name_l"], students_df["_programme_l"], students_df["_email_l"]]))
+
+# same for the course/grade rows
+COURSE_COLS = list(grades_long_df.columns)
+add_lower_column(grades_long_df, "student_id", "_sid_l")
+add_lower_column(grades_long_df, "course_id", "_cid_l")
+add_lower_column(grades_long_df, "title", "_title_l")
+add_lower_column(grades_long_df, "lecturer", "_lecturer_l")
+
+def categorize(df: pd.DataFrame, cols):
+    """Dictionary-encode low-cardinality string columns (stored once per distinct value + small int codes)."""
+    for col in cols:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+
+def contains_mask(col: pd.Series, q: str) -> pd.Series:
+    """Substring mask for a column; categorical columns are searched once per distinct value."""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        hits = np.append(col.cat.categories.str.contains(q, regex=False), False)  # code -1 (missing) -> False
+        return pd.Series(hits[col.cat.codes.to_numpy()], index=col.index)
+    return col.str.contains(q, regex=False, na=False)
+
+categorize(students_df, ("programme", "year", "_programme_l"))
+categorize(grades_long_df, ("course_id", "lecturer", "title", "_sid_l", "_cid_l", "_title_l", "_lecturer_l"))
+
 # warn if unstructured dir is missing (not fatal)
 if not UNSTRUCTURED_DIR.exists():
     print(f"[WARN] Unstructured dir not found at {UNSTRUCTURED_DIR}. Create it and add student folders.", file=sys.stderr)
 
-def list_student_docs(student_id: str):
+# -------------------------
+# DOCUMENT INDEX
+# -------------------------
+# Everything a search reads about the documents, in one immutable snapshot. Refreshes build a new
+# DocIndex and publish it with a single assignment to DOCS; requests read DOCS once and use that local,
+# so they never mix the listing, texts and filters of two different scans.
+DocIndex = collections.namedtuple("DocIndex", [
+    "scan",          # (folder names, {(student_id, filename): mtime_ns}) the snapshot was built from
+    "listing",       # student_id -> sorted [(filename, path)] of the files in that student's folder
+    "sids",          # lowercase student_id -> folder names in UNSTRUCTURED_DIR
+    "entries",       # (student_id, filename) -> {"mtime", "text", "grams": packed text filter, "name_grams"}
+    "keys",          # sorted (student_id, filename); row order of the filter matrices below
+    "text_filters",  # one packed trigram bitset (gram_filter) per document text, rows aligned with keys
+    "name_filters",  # same for the filenames
+    "previews",      # (student_id, filename) -> preview snippet shown with document results
+])
+DOCS = None
+TEXT_FILTER_BITS = 1 << 16  # 8 KiB per document
+NAME_FILTER_BITS = 1 << 9   # 64 bytes per filename
+PREVIEW_CHARS = 300
+
+PAGE_SIZE = 50        # default results per section per page (?page_size=...)
+MAX_PAGE_SIZE = 500
+
+_DOC_WATCHER_PID = None  # process whose background thread keeps DOCS up to date
+_DOC_WATCHER_LOCK = threading.Lock()
+DOC_INDEX_CHECK_INTERVAL = 2.0  # seconds between re-scans of the student folders
+
+def _scan_unstructured():
+    """One pass over the student folders: (sorted folder names, {(student_id, filename): mtime_ns}).
+
+    File mtimes are included so that files rewritten in place (which leave directory mtimes alone)
+    are noticed, not just added, removed or renamed ones.
+    """
+    folders, mtimes = [], {}
+    if not UNSTRUCTURED_DIR.exists():
+        return tuple(folders), mtimes
+    with os.scandir(UNSTRUCTURED_DIR) as it:
+        folders = sorted(entry.name for entry in it if entry.is_dir())
+    for sid in folders:
+        try:
+            with os.scandir(UNSTRUCTURED_DIR / sid) as it:
+                files = sorted((entry.name, entry.stat().st_mtime_ns) for entry in it if entry.is_file())
+        except OSError:
+            continue  # folder removed while scanning; the next scan settles it
+        for fname, mtime in files:
+            mtimes[(sid, fname)] = mtime
+    return tuple(folders), mtimes
+
+def _doc_listing(scan):
+    """Per-student file listing and lowercase folder lookup for a scan of UNSTRUCTURED_DIR."""
+    folders, mtimes = scan
+    listing = {sid: [] for sid in folders}
+    sids = {}
+    for sid in folders:
+        sids.setdefault(sid.lower(), []).append(sid)
+    for sid, fname in mtimes:
+        listing[sid].append((fname, UNSTRUCTURED_DIR / sid / fname))
+    return listing, sids
+
+def load_pickle_safe(path: Path):
+    if not path.exists():
+        return {}
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except Exception as e:
+        print(f"[WARN] Could not load index {path}: {e}", file=sys.stderr)
+        return {}
+
+def save_pickle_safe(path: Path, obj):
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)  # atomic, so other processes never load a half-written index
+    except Exception as e:
+        print(f"[WARN] Could not save index {path}: {e}", file=sys.stderr)
+
+def gram_filter(text: str, bits: int):
+    """Fixed-size bitset of the hashed trigrams of text.lower(), packed into bits // 8 bytes.
+
+    A set bit only says that some trigram hashing to it occurs, so lookups can give false positives
+    (callers verify the match) but never false negatives.
+    """
+    codes = np.frombuffer(text.lower().encode("utf-32-le", "surrogatepass"), dtype=np.uint32).astype(np.uint64)
+    hit = np.zeros(bits, dtype=bool)
+    if len(codes) >= 3:
+        grams = (codes[:-2] << np.uint64(42)) ^ (codes[1:-1] << np.uint64(21)) ^ codes[2:]  # 21 bits per code point
+        grams *= np.uint64(0x9E3779B97F4A7C15)  # multiplicative hash; the top bits pick the filter bit
+        hit[grams >> np.uint64(65 - bits.bit_length())] = True
+    return np.packbits(hit, bitorder="little")
+
+def filter_matrix(rows, bits: int):
+    """Stack packed filters (bytes or arrays of bits // 8 bytes) into one (len(rows), bits // 8) uint8 matrix."""
+    return np.frombuffer(b"".join(bytes(row) for row in rows), dtype=np.uint8).reshape(len(rows), bits // 8)
+
+def make_doc_index(scan, entries):
+    """Assemble a DocIndex snapshot from a scan and its (student_id, filename) -> entry map."""
+    listing, sids = _doc_listing(scan)
+    keys = sorted(entries)
+    text_filters = filter_matrix([entries[key]["grams"] for key in keys], TEXT_FILTER_BITS)
+    name_filters = filter_matrix([entries[key]["name_grams"] for key in keys], NAME_FILTER_BITS)
+    previews = {key: entry["text"][:PREVIEW_CHARS] or "(no extractable text)" for key, entry in entries.items()}
+    return DocIndex(scan, listing, sids, entries, keys, text_filters, name_filters, previews)
+
+def build_doc_index(scan):
+    """Build the document index, re-extracting only files whose mtime changed since INDEX_PKL."""
+    global DOCS
+    cached = load_pickle_safe(INDEX_PKL)
+    entries = {}
+    stale = []  # (key, path, mtime) of files that are new or changed since the last save
+    for key, mtime in scan[1].items():
+        entry = cached.get(key)
+        if entry is None or entry["mtime"] != mtime:
+            stale.append((key, UNSTRUCTURED_DIR.joinpath(*key), mtime))
+        else:
+            entries[key] = entry
+    for (key, file, mtime), text in zip(stale, extract_many([file for _, file, _ in stale])):
+        entries[key] = {"mtime": mtime, "text": text}
+    changed = bool(stale)
+    for key, entry in entries.items():
+        # new, or saved before the filters existed / with another filter size
+        if len(entry.get("grams", b"")) != TEXT_FILTER_BITS // 8:
+            entry["grams"] = gram_filter(entry["text"], TEXT_FILTER_BITS).tobytes()
+            changed = True
+        if len(entry.get("name_grams", b"")) != NAME_FILTER_BITS // 8:
+            entry["name_grams"] = gram_filter(key[1], NAME_FILTER_BITS).tobytes()
+            changed = True
+    if changed or len(entries) != len(cached):
+        save_pickle_safe(INDEX_PKL, entries)
+    DOCS = make_doc_index(scan, entries)
+    cache.clear()  # cached pages may list documents that changed
+
+def update_doc_index(scan):
+    """Re-index only the files added, removed or modified since the current DOCS snapshot.
+
+    Used by the background refresh: it builds a new snapshot from the unchanged entries plus the
+    re-extracted files and publishes it with one assignment. INDEX_PKL is left alone; the next
+    startup re-extracts whatever changed since it was written.
+    """
+    global DOCS
+    old = DOCS.entries
+    entries = {key: entry for key, entry in old.items() if scan[1].get(key) == entry["mtime"]}
+    stale = [(key, UNSTRUCTURED_DIR.joinpath(*key), mtime) for key, mtime in scan[1].items() if key not in entries]
+    for (key, file, mtime), text in zip(stale, extract_many([file for _, file, _ in stale])):
+        entries[key] = {"mtime": mtime, "text": text, "grams": gram_filter(text, TEXT_FILTER_BITS).tobytes(),
+                        "name_grams": gram_filter(key[1], NAME_FILTER_BITS).tobytes()}
+    DOCS = make_doc_index(scan, entries)
+    cache.clear()  # cached pages may list documents that changed
+
+def candidate_keys(filters, keys, q: str, bits: int):
+    """Return the keys that may contain q as a substring (a superset; callers verify the match).
+
+    Keeps only the rows of `filters` that have every bit of q's trigrams set, reading just those few
+    byte columns. Queries too short to have a trigram get every key, i.e. a plain regex scan.
+    """
+    want = gram_filter(q, bits)
+    cols = np.flatnonzero(want)
+    if not len(cols):
+        return set(keys)
+    rows = ((filters[:, cols] & want[cols]) == want[cols]).all(axis=1)
+    return {keys[i] for i in np.flatnonzero(rows)}
+
+def refresh_docs_if_changed():
+    """Re-index the documents if a file was added, removed or modified since the current snapshot."""
+    scan = _scan_unstructured()
+    if scan != DOCS.scan:
+        update_doc_index(scan)
+
+def _watch_docs():
+    while True:
+        time.sleep(DOC_INDEX_CHECK_INTERVAL)
+        try:
+            refresh_docs_if_changed()
+        except Exception as e:
+            print(f"[WARN] Document index refresh failed: {e}", file=sys.stderr)
+
+def start_doc_watcher():
+    """Start this process's background refresh thread, so scans and re-extraction never run inside a request.
+
+    Started lazily from the first request: threads don't survive the fork into gunicorn workers.
+    """
+    global _DOC_WATCHER_PID
+    pid = os.getpid()
+    if _DOC_WATCHER_PID == pid:
+        return
+    with _DOC_WATCHER_LOCK:
+        if _DOC_WATCHER_PID != pid:
+            threading.Thread(target=_watch_docs, name="doc-index-watcher", daemon=True).start()
+            _DOC_WATCHER_PID = pid
+
+build_doc_index(_scan_unstructured())
+shutdown_pdf_pool()  # the pool is only needed for the startup build; don't carry it into forked workers
+
+@app.before_request
+def check_docs():
+    start_doc_watcher()
+
+def list_student_docs(student_id: str, docs=None):
     """Return list of dicts: {'filename':..., 'filepath': ...} for files in student's folder."""
     sid = str(student_id).strip()
-    folder = UNSTRUCTURED_DIR / sid
-    docs = []
-    if folder.exists() and folder.is_dir():
-        for f in sorted(folder.iterdir()):
-            if f.is_file():
-                docs.append({"filename": f.name, "filepath": f"/files/{sid}/{f.name}"})
-    return docs
-
-@app.route("/", methods=["GET"])
-def index():
-    query = request.args.get("q", "").strip()
-    filter_type = request.args.get("filter", "all")
-    results = {"students": [], "courses": [], "documents": []}
+    return [{"filename": n, "filepath": f"/files/{sid}/{n}"} for n, _ in (docs or DOCS).listing.get(sid, [])]
 
-    if query:
-        q = query.strip().lower()
-        seen_docs = set()  # (student_id, filename) to prevent duplicates
-
-        # 1) STUDENT MATCH: if query matches student id or student name -> include student and their docs
-        for _, row in students_df.iterrows():
-            sid = str(row.get("student_id", "")).strip()
-            name = str(row.get("name", "")).strip()
-            programme = str(row.get("programme", "")).strip()
-            email = str(row.get("email", "")).strip()
-
-            # match by exact id or partial name/programme/email
-            if q == sid.lower() or q in name.lower() or q in programme.lower() or q in email.lower():
-                # add student record once
-                results["students"].append(row.to_dict())
-
-                # add student's documents (listed once)
-                docs = list_student_docs(sid)
-                for d in docs:
-                    key = (sid, d["filename"])
-                    if key not in seen_docs:
-                        seen_docs.add(key)
-                        results["documents"].append({
-                            "student_id": sid,
-                            "filename": d["filename"],
-                            "preview": "(student document)"
-                        })
-
-        # 2) COURSES / GRADES: search in grades_long_df (student_id, course_id, maybe title/lecturer)
-        if not grades_long_df.empty:
-            for _, row in grades_long_df.iterrows():
-                sid = str(row.get("student_id", "")).strip().lower()
-                cid = str(row.get("course_id", "")).strip().lower()
-                title = str(row.get("title", "")).strip().lower() if "title" in row else ""
-                lecturer = str(row.get("lecturer", "")).strip().lower() if "lecturer" in row else ""
-                if q in sid or q in cid or q in title or q in lecturer:
-                    results["courses"].append(row.to_dict())
-
-        # 3) DOCUMENTS: search by filename/folder name OR inside file text
-        #    - If query exactly equals a student folder name, return that student's files (if not already added)
-        #    - Else match filename or content
-        if UNSTRUCTURED_DIR.exists():
-            for student_folder in sorted(UNSTRUCTURED_DIR.iterdir()):
-                if not student_folder.is_dir():
-                    continue
-                sid_folder = student_folder.name
-                for file in sorted(student_folder.iterdir()):
-                    if not file.is_file():
-                        continue
-                    key = (sid_folder, file.name)
-                    fname_lower = file.name.lower()
-
-                    # If query is exact student id -> include the file (if not already added)
-                    if q == sid_folder.lower():
-                        if key not in seen_docs:
-                            seen_docs.add(key)
-                            results["documents"].append({
-                                "student_id": sid_folder,
-                                "filename": file.name,
-                                "preview": "(student document)"
-                            })
-                        continue
-
-                    # If query is in filename
-                    if q in fname_lower:
-                        if key not in seen_docs:
-                            seen_docs.add(key)
-                            text = extract_text_from_file(file)
-                            results["documents"].append({
-                                "student_id": sid_folder,
-                                "filename": file.name,
-                                "preview": text[:300] if text else "(no extractable text)"
-                            })
-                        continue
-
-                    # Otherwise, try to search inside file text (if extractable)
-                    text = extract_text_from_file(file)
-                    if text and q in text.lower():
-                        if key not in seen_docs:
-                            seen_docs.add(key)
-                            results["documents"].append({
-                                "student_id": sid_folder,
-                                "filename": file.name,
-                                "preview": text[:300]
-                            })
-
-        # 4) APPLY FILTERS
-        if filter_type == "students":
-            results["courses"] = []
-            results["documents"] = []
-        elif filter_type == "courses":
-            results["students"] = []
-            results["documents"] = []
-        elif filter_type == "docs":
-            results["students"] = []
-            results["courses"] = []
-
-    # Render page (single template string for simplicity)
-    html = """
+# -------------------------
+# SEARCH PAGE
+# -------------------------
+# single template string for simplicity; compiled once instead of on every request
+_INDEX_TMPL_SRC = """
 <!doctype html>
 <html lang="en">
 <head>
@@ -231,6 +407,7 @@ body { background: linear-gradient(180deg, #f7fbff, #ffffff); padding: 24px; fon
         <option value="courses" {% if filter_type=='courses' %}selected{% endif %}>Courses</option>
         <option value="docs" {% if filter_type=='docs' %}selected{% endif %}>Documents</option>
       </select>
+      {% if page_size != default_page_size %}<input type="hidden" name="page_size" value="{{ page_size }}">{% endif %}
       <button class="btn btn-primary">Search</button>
     </div>
   </form>
@@ -300,23 +477,158 @@ body { background: linear-gradient(180deg, #f7fbff, #ffffff); padding: 24px; fon
     {% endfor %}
   </div>
 
+  {% if page > 0 or has_next %}
+  <nav class="d-flex justify-content-between align-items-center mt-4">
+    <div>
+      {% if page > 0 %}
+      <a href="{{ url_for('index', q=query, filter=filter_type, page=page - 1, page_size=page_size) }}" class="btn btn-outline-secondary btn-sm">&laquo; Previous</a>
+      {% endif %}
+    </div>
+    <span class="text-muted">Page {{ page + 1 }}</span>
+    <div>
+      {% if has_next %}
+      <a href="{{ url_for('index', q=query, filter=filter_type, page=page + 1, page_size=page_size) }}" class="btn btn-outline-secondary btn-sm">Next &raquo;</a>
+      {% endif %}
+    </div>
+  </nav>
+  {% endif %}
+
 </div>
 </body>
 </html>
 """
 
-    # supply template variables
-    return render_template_string(
-        html,
+_INDEX_TMPL = app.jinja_env.from_string(_INDEX_TMPL_SRC)
+
+def parse_int_arg(name: str, default: int, lo: int, hi: int) -> int:
+    """Read an integer query parameter, falling back to default and clamping to [lo, hi]."""
+    try:
+        value = int(request.args.get(name, default))
+    except (TypeError, ValueError):
+        value = default
+    return max(lo, min(value, hi))
+
+def render_index(results, totals, query: str, filter_type: str, page: int = 0, page_size: int = PAGE_SIZE):
+    # Render page (template compiled once at import)
+    return Response(_INDEX_TMPL.render(
         students=results["students"],
         courses_list=results["courses"],
         docs=results["documents"],
         query=query,
         filter_type=filter_type,
-        results_students_count=len(results["students"]),
-        results_courses_count=len(results["courses"]),
-        results_docs_count=len(results["documents"])
-    )
+        page=page,
+        page_size=page_size,
+        default_page_size=PAGE_SIZE,
+        has_next=(page + 1) * page_size < max(totals.values()),
+        results_students_count=totals["students"],
+        results_courses_count=totals["courses"],
+        results_docs_count=totals["documents"]
+    ))
+
+@app.route("/", methods=["GET"])
+@cache.cached(query_string=True)
+def index():
+    query = request.args.get("q", "").strip()
+    filter_type = request.args.get("filter", "all")
+    page = parse_int_arg("page", 0, 0, 10**6)
+    page_size = parse_int_arg("page_size", PAGE_SIZE, 1, MAX_PAGE_SIZE)
+    start, end = page * page_size, (page + 1) * page_size
+    results = {"students": [], "courses": [], "documents": []}
+    totals = {"students": 0, "courses": 0, "documents": 0}  # matches across all pages
+    if not query:
+        return render_index(results, totals, query, filter_type, page, page_size)
+
+    # only run the sections the filter keeps (unknown filter values show everything)
+    want_students = filter_type not in ("courses", "docs")
+    want_courses = filter_type not in ("students", "docs")
+    want_docs = filter_type not in ("students", "courses")
+
+    q = query.strip().lower()
+    docs = DOCS               # one snapshot of the document index for the whole request
+    doc_keys = []             # (student_id, filename) of matching documents, in display order
+    student_doc_keys = set()  # documents listed because their student matched
+    seen_docs = set()         # to prevent duplicates
+
+    # 1) STUDENT MATCH: if query matches student id or student name -> include student and their docs
+    if (want_students or want_docs) and not students_df.empty:
+        if q in STUDENT_BY_SID and q not in STUDENT_HAYSTACK:
+            # exact id that matches nothing else: direct row lookup instead of the four-column mask
+            matched = students_df.loc[[STUDENT_BY_SID[q]], STUDENT_COLS]
+        else:
+            # match by exact id or partial name/programme/email (vectorized over precomputed lowercase columns)
+            mask = (
+                (students_df["_sid_l"] == q)
+                | contains_mask(students_df["_name_l"], q)
+                | contains_mask(students_df["_programme_l"], q)
+                | contains_mask(students_df["_email_l"], q)
+            )
+            matched = students_df.loc[mask, STUDENT_COLS]
+
+        # add student records for the requested page only
+        if want_students:
+            totals["students"] = len(matched)
+            results["students"] = matched.iloc[start:end].to_dict("records")
+
+        # add every matched student's documents (listed once)
+        if want_docs:
+            for sid in matched.get("student_id", []):
+                sid = str(sid).strip()
+                for d in list_student_docs(sid, docs):
+                    key = (sid, d["filename"])
+                    if key not in seen_docs:
+                        seen_docs.add(key)
+                        student_doc_keys.add(key)
+                        doc_keys.append(key)
+
+    # 2) COURSES / GRADES: search in grades_long_df (student_id, course_id, maybe title/lecturer)
+    if want_courses and not grades_long_df.empty:
+        mask = (
+            contains_mask(grades_long_df["_sid_l"], q)
+            | contains_mask(grades_long_df["_cid_l"], q)
+            | contains_mask(grades_long_df["_title_l"], q)
+            | contains_mask(grades_long_df["_lecturer_l"], q)
+        )
+        matched_courses = grades_long_df.loc[mask, COURSE_COLS]
+        totals["courses"] = len(matched_courses)
+        results["courses"] = matched_courses.iloc[start:end].to_dict("records")
+
+    # 3) DOCUMENTS: search by filename/folder name OR inside file text
+    #    - If query exactly equals a student folder name, return that student's files (if not already added)
+    #    - Else match filename or content
+    if want_docs and docs.entries:
+        # If query is exact student id -> include the student's files
+        sid_hits = {(sid, fname) for sid in docs.sids.get(q, []) for fname, _ in docs.listing[sid]}
+        student_doc_keys |= sid_hits
+        # case-insensitive scan of the original text, without building lowercased copies; compiled from the
+        # query as typed, since lowercasing first can change its length (e.g. "İ" -> "i̇") and miss matches
+        pattern = re.compile(re.escape(query), re.IGNORECASE)
+        # If query is in filename
+        filename_hits = {key for key in candidate_keys(docs.name_filters, docs.keys, q, NAME_FILTER_BITS) if pattern.search(key[1])}
+        # Otherwise, search inside the indexed file text (if extractable)
+        candidates = candidate_keys(docs.text_filters, docs.keys, q, TEXT_FILTER_BITS)
+        content_hits = {key for key in candidates if pattern.search(docs.entries[key]["text"])}
+
+        doc_keys.extend(key for key in sorted(sid_hits | filename_hits | content_hits) if key not in seen_docs)
+
+    # build result cards for the requested page only
+    totals["documents"] = len(doc_keys)
+    for key in doc_keys[start:end]:
+        results["documents"].append({
+            "student_id": key[0],
+            "filename": key[1],
+            "preview": "(student document)" if key in student_doc_keys else docs.previews.get(key, "(no extractable text)")
+        })
+
+    return render_index(results, totals, query, filter_type, page, page_size)
+
+def attachment_filename_params(name: str):
+    """Content-Disposition filename params as werkzeug's send_file builds them (RFC 5987 for non-ASCII names)."""
+    try:
+        name.encode("ascii")
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+        return {"filename": simple, "filename*": f"UTF-8''{quote(name, safe='!#$&+^`|~')}"}
+    return {"filename": name}
 
 @app.route("/files/<student_id>/<path:filename>")
 def files(student_id, filename):
@@ -326,10 +638,19 @@ def files(student_id, filename):
     file_path = folder / filename
     if not file_path.exists():
         return "File not found", 404
-    return send_from_directory(str(folder), filename, as_attachment=True)
+    if SENDFILE == "nginx":
+        if safe_join(str(UNSTRUCTURED_DIR), student_id, filename) is None:
+            return "File not found", 404
+        response = Response(mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream")
+        response.headers["X-Accel-Redirect"] = quote(f"{ACCEL_REDIRECT_PREFIX}{student_id}/{filename}")
+        response.headers.set("Content-Disposition", "attachment", **attachment_filename_params(file_path.name))
+        return response
+    return send_from_directory(str(folder), filename, as_attachment=True, conditional=True)
+
 
 # -------------------------
 # RUN
 # -------------------------
+# production: gunicorn -c gunicorn.conf.py prototype_app:app  (preforked workers, see gunicorn.conf.py)
 if __name__ == "__main__":
-    app.run(debug=True, port=5000)
+    app.run(debug=True, port=5000)  # single-process development server